@@ -0,0 +1,449 @@
+/**
+ * Bit-level helpers for Kanerva SDM.
+ *
+ * Binary address vectors are stored bit-packed into 64-bit words, so the
+ * Hamming distance between two addresses reduces to XOR and popcount.
+ *
+ * (c) 2026 Simon Wong.
+ */
+
+#ifndef KANERVA_SDM_BIT_OPS_H
+#define KANERVA_SDM_BIT_OPS_H
+
+#include <cstddef>
+#include <cstdint>
+#include <vector>
+
+#if defined(_MSC_VER) && defined(_M_X64)
+#include <intrin.h>
+#endif
+
+// On x86-64 with GCC or Clang, AVX2 kernels are compiled with a function-level
+// target attribute and chosen at runtime, so generic builds still ship them.
+#if (defined(__x86_64__) || defined(__amd64__)) && (defined(__GNUC__) || defined(__clang__))
+#define KANERVA_SDM_AVX2_DISPATCH 1
+#endif
+
+#if defined(KANERVA_SDM_AVX2_DISPATCH)
+#include <immintrin.h>
+#endif
+
+namespace bit_ops {
+
+/**
+ * Number of 64-bit words needed to hold a bit vector.
+ *
+ * @param num_bits Length of the bit vector.
+ *
+ * @return Number of words, rounded up.
+ */
+inline int words_for_bits(int num_bits) {
+    return (num_bits + 63) / 64;
+}
+
+/**
+ * Counts the set bits in a 64-bit word.
+ *
+ * @param word Word to count.
+ *
+ * @return Number of set bits.
+ */
+inline int popcount64(uint64_t word) {
+#if defined(__GNUC__) || defined(__clang__)
+    return __builtin_popcountll(word);
+#elif defined(_MSC_VER) && defined(_M_X64)
+    return static_cast<int>(__popcnt64(word));
+#else
+    word = word - ((word >> 1) & 0x5555555555555555ULL);
+    word = (word & 0x3333333333333333ULL) + ((word >> 2) & 0x3333333333333333ULL);
+    word = (word + (word >> 4)) & 0x0F0F0F0F0F0F0F0FULL;
+    return static_cast<int>((word * 0x0101010101010101ULL) >> 56);
+#endif
+}
+
+/**
+ * Finds the index of the lowest set bit in a non-zero 64-bit word.
+ *
+ * @param word Word to scan; must not be zero.
+ *
+ * @return Index of the lowest set bit.
+ */
+inline int count_trailing_zeros64(uint64_t word) {
+#if defined(__GNUC__) || defined(__clang__)
+    return __builtin_ctzll(word);
+#elif defined(_MSC_VER) && defined(_M_X64)
+    unsigned long index;
+    _BitScanForward64(&index, word);
+    return static_cast<int>(index);
+#else
+    int index = 0;
+    while (!(word & 1)) {
+        word >>= 1;
+        ++index;
+    }
+    return index;
+#endif
+}
+
+/**
+ * Appends the indices of all set bits in a bitmap to a list, in ascending order.
+ *
+ * @param bitmap Bitmap of num_words words.
+ * @param num_words Number of words in the bitmap.
+ * @param base Index of the first bit in the bitmap, added to every appended index.
+ * @param indices List to append bit indices to.
+ */
+inline void append_set_bits(const uint64_t* bitmap, int num_words, int base, std::vector<int>& indices) {
+    for (int w = 0; w < num_words; ++w) {
+        uint64_t word = bitmap[w];
+        while (word) {
+            indices.push_back(base + w * 64 + count_trailing_zeros64(word));
+            word &= word - 1;  // Clear the lowest set bit.
+        }
+    }
+}
+
+/**
+ * Packs a vector of 0/1 bytes into 64-bit words, least significant bit first.
+ * Padding bits in the last word are set to zero.
+ *
+ * @param bits Pointer to num_bits bytes, each 0 or 1.
+ * @param num_bits Length of the bit vector.
+ * @param words Output buffer of words_for_bits(num_bits) words.
+ */
+inline void pack_bits(const uint8_t* bits, int num_bits, uint64_t* words) {
+    const int num_words = words_for_bits(num_bits);
+    for (int w = 0; w < num_words; ++w) {
+        const int begin = w * 64;
+        const int end = (begin + 64 < num_bits) ? begin + 64 : num_bits;
+        uint64_t word = 0;
+        for (int i = begin; i < end; ++i) {
+            word |= static_cast<uint64_t>(bits[i]) << (i - begin);
+        }
+        words[w] = word;
+    }
+}
+
+/**
+ * Checks that every byte of a buffer is 0 or 1.
+ *
+ * The bytes are OR-reduced and the result tested for any bit above bit 0, so
+ * there is no per-element branch and the compiler can vectorize the loop.
+ *
+ * @param bytes Buffer to check.
+ * @param size Number of bytes.
+ *
+ * @return True if the buffer is binary.
+ */
+inline bool is_binary(const uint8_t* bytes, std::size_t size) {
+    uint8_t combined = 0;
+    for (std::size_t i = 0; i < size; ++i) {
+        combined |= bytes[i];
+    }
+    return (combined & 0xFE) == 0;
+}
+
+/**
+ * Checks that every element of an int buffer is 0 or 1, without per-element branches.
+ *
+ * @param values Buffer to check.
+ * @param size Number of elements.
+ *
+ * @return True if the buffer is binary.
+ */
+inline bool is_binary(const int* values, std::size_t size) {
+    unsigned int combined = 0;
+    for (std::size_t i = 0; i < size; ++i) {
+        combined |= static_cast<unsigned int>(values[i]);
+    }
+    return (combined & ~1u) == 0;
+}
+
+/**
+ * Thresholds sums to binary outputs: 1 where the sum is >= 0, 0 where it is negative.
+ *
+ * The output is the inverted sign bit of each sum, so there is no data-dependent
+ * branch and the loop vectorizes.
+ *
+ * @param sums Sums to threshold.
+ * @param size Number of sums.
+ * @param bits Output buffer of size bytes, each 0 or 1.
+ */
+inline void sign_to_bits(const int32_t* sums, int size, uint8_t* bits) {
+    for (int i = 0; i < size; ++i) {
+        bits[i] = static_cast<uint8_t>(1u ^ (static_cast<uint32_t>(sums[i]) >> 31));
+    }
+}
+
+/**
+ * Counts the set bits in a bitmap.
+ *
+ * @param bitmap Bitmap of num_words words.
+ * @param num_words Number of words in the bitmap.
+ *
+ * @return Number of set bits.
+ */
+inline int popcount_bitmap(const uint64_t* bitmap, int num_words) {
+    int count = 0;
+    for (int w = 0; w < num_words; ++w) {
+        count += popcount64(bitmap[w]);
+    }
+    return count;
+}
+
+/**
+ * Computes the Hamming distance between two bit-packed vectors.
+ *
+ * @param a First vector of num_words words.
+ * @param b Second vector of num_words words.
+ * @param num_words Number of words in each vector.
+ *
+ * @return Number of differing bits.
+ */
+inline int hamming_distance(const uint64_t* a, const uint64_t* b, int num_words) {
+    int distance = 0;
+    for (int i = 0; i < num_words; ++i) {
+        distance += popcount64(a[i] ^ b[i]);
+    }
+    return distance;
+}
+
+/**
+ * xoshiro256++ pseudorandom generator (Blackman and Vigna), producing 64 random
+ * bits per call. Seeded through splitmix64 so any 64-bit seed gives a valid state.
+ */
+class Xoshiro256PlusPlus {
+public:
+    explicit Xoshiro256PlusPlus(uint64_t seed) {
+        for (int i = 0; i < 4; ++i) {
+            seed += 0x9E3779B97F4A7C15ULL;
+            uint64_t z = seed;
+            z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+            z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+            state_[i] = z ^ (z >> 31);
+        }
+    }
+
+    uint64_t next() {
+        const uint64_t result = rotl(state_[0] + state_[3], 23) + state_[0];
+        const uint64_t t = state_[1] << 17;
+        state_[2] ^= state_[0];
+        state_[3] ^= state_[1];
+        state_[1] ^= state_[2];
+        state_[0] ^= state_[3];
+        state_[2] ^= t;
+        state_[3] = rotl(state_[3], 45);
+        return result;
+    }
+
+private:
+    uint64_t state_[4];
+
+    static uint64_t rotl(uint64_t x, int k) {
+        return (x << k) | (x >> (64 - k));
+    }
+};
+
+/**
+ * Computes the 64-bit FNV-1a hash of a word array, byte by byte in little-endian order.
+ *
+ * @param words Words to hash.
+ * @param num_words Number of words.
+ *
+ * @return Hash value.
+ */
+inline uint64_t fnv1a_hash(const uint64_t* words, std::size_t num_words) {
+    uint64_t hash = 0xCBF29CE484222325ULL;
+    for (std::size_t i = 0; i < num_words; ++i) {
+        for (int byte = 0; byte < 8; ++byte) {
+            hash ^= (words[i] >> (8 * byte)) & 0xFF;
+            hash *= 0x100000001B3ULL;
+        }
+    }
+    return hash;
+}
+
+/**
+ * Signature shared by the Hamming scan kernels.
+ *
+ * @param query Bit-packed query of num_words words.
+ * @param locations Bit-packed addresses, num_words words per location, row-major.
+ * @param num_locations Number of locations to scan.
+ * @param num_words Number of words per address.
+ * @param threshold Maximum Hamming distance for a location to be activated.
+ * @param bitmap Output bitmap with one bit per location, set if activated.
+ */
+typedef void (*HammingScanFn)(const uint64_t* query, const uint64_t* locations, int num_locations,
+                              int num_words, int threshold, uint64_t* bitmap);
+
+/**
+ * Scans locations for addresses within a Hamming threshold of a query.
+ * Templated on the address width so fixed widths compile to straight-line code;
+ * NumWords == 0 reads the width from num_words at runtime instead.
+ */
+template <int NumWords>
+inline void hamming_scan(const uint64_t* query, const uint64_t* locations, int num_locations,
+                         int num_words, int threshold, uint64_t* bitmap) {
+    const int words = NumWords > 0 ? NumWords : num_words;
+    for (int base = 0; base < num_locations; base += 64) {
+        const int end = (base + 64 < num_locations) ? base + 64 : num_locations;
+        uint64_t word = 0;
+        for (int i = base; i < end; ++i, locations += words) {
+            const int distance = hamming_distance(query, locations, words);
+            word |= static_cast<uint64_t>(distance <= threshold) << (i - base);
+        }
+        bitmap[base / 64] = word;
+    }
+}
+
+#if defined(KANERVA_SDM_AVX2_DISPATCH)
+
+/**
+ * Counts the bits of each byte of a 256-bit vector with the nibble lookup table
+ * method (Mula et al.) and sums them into four 64-bit lanes.
+ *
+ * @param v Vector to count.
+ *
+ * @return Per-lane bit counts.
+ */
+__attribute__((target("avx2")))
+inline __m256i popcount256_lanes(__m256i v) {
+    const __m256i lookup = _mm256_setr_epi8(
+        0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4,
+        0, 1, 1, 2, 1, 2, 2, 3, 1, 2, 2, 3, 2, 3, 3, 4);
+    const __m256i low_mask = _mm256_set1_epi8(0x0f);
+    const __m256i lo = _mm256_and_si256(v, low_mask);
+    const __m256i hi = _mm256_and_si256(_mm256_srli_epi16(v, 4), low_mask);
+    const __m256i counts = _mm256_add_epi8(_mm256_shuffle_epi8(lookup, lo),
+                                           _mm256_shuffle_epi8(lookup, hi));
+    return _mm256_sad_epu8(counts, _mm256_setzero_si256());
+}
+
+/**
+ * Sums the 256-bit strides of the XOR of a query and one location into four
+ * 64-bit partial counts. Words past the last full stride are not included.
+ */
+__attribute__((target("avx2")))
+inline __m256i xor_popcount_strides(const uint64_t* query, const uint64_t* location, int num_words) {
+    __m256i total = _mm256_setzero_si256();
+    for (int i = 0; i + 4 <= num_words; i += 4) {
+        const __m256i v = _mm256_xor_si256(
+            _mm256_loadu_si256(reinterpret_cast<const __m256i*>(query + i)),
+            _mm256_loadu_si256(reinterpret_cast<const __m256i*>(location + i)));
+        total = _mm256_add_epi64(total, popcount256_lanes(v));
+    }
+    return total;
+}
+
+/**
+ * AVX2 variant of hamming_scan for addresses of at least four words.
+ *
+ * Four locations are handled per step: each location's 256-bit strides are
+ * counted into partial lane sums, the four sums are transposed and added into
+ * one vector of four distances, and VPCMPGTQ against the broadcast threshold
+ * with VMOVMSKPD emits their four activation bits at once. Words past the last
+ * full stride and leftover locations use scalar popcount.
+ */
+template <int NumWords>
+__attribute__((target("avx2")))
+void hamming_scan_avx2(const uint64_t* query, const uint64_t* locations, int num_locations,
+                       int num_words, int threshold, uint64_t* bitmap) {
+    const int words = NumWords > 0 ? NumWords : num_words;
+    const int stride_words = words - words % 4;
+    const __m256i limit = _mm256_set1_epi64x(static_cast<long long>(threshold) + 1);
+    for (int base = 0; base < num_locations; base += 64) {
+        const int end = (base + 64 < num_locations) ? base + 64 : num_locations;
+        uint64_t word = 0;
+        int i = base;
+        for (; i + 4 <= end; i += 4, locations += 4 * words) {
+            const __m256i t0 = xor_popcount_strides(query, locations, words);
+            const __m256i t1 = xor_popcount_strides(query, locations + words, words);
+            const __m256i t2 = xor_popcount_strides(query, locations + 2 * words, words);
+            const __m256i t3 = xor_popcount_strides(query, locations + 3 * words, words);
+            // [t0 lanes 0+1, t1 lanes 0+1, t0 lanes 2+3, t1 lanes 2+3], likewise for t2/t3.
+            const __m256i t01 = _mm256_add_epi64(_mm256_unpacklo_epi64(t0, t1),
+                                                 _mm256_unpackhi_epi64(t0, t1));
+            const __m256i t23 = _mm256_add_epi64(_mm256_unpacklo_epi64(t2, t3),
+                                                 _mm256_unpackhi_epi64(t2, t3));
+            __m256i distances = _mm256_add_epi64(_mm256_permute2x128_si256(t01, t23, 0x20),
+                                                 _mm256_permute2x128_si256(t01, t23, 0x31));
+            if (stride_words < words) {
+                long long tail[4] = {0, 0, 0, 0};
+                for (int k = 0; k < 4; ++k) {
+                    tail[k] = hamming_distance(query + stride_words,
+                                               locations + k * words + stride_words,
+                                               words - stride_words);
+                }
+                distances = _mm256_add_epi64(
+                    distances, _mm256_setr_epi64x(tail[0], tail[1], tail[2], tail[3]));
+            }
+            const int activated = _mm256_movemask_pd(
+                _mm256_castsi256_pd(_mm256_cmpgt_epi64(limit, distances)));
+            word |= static_cast<uint64_t>(activated) << (i - base);
+        }
+        for (; i < end; ++i, locations += words) {
+            const int distance = hamming_distance(query, locations, words);
+            word |= static_cast<uint64_t>(distance <= threshold) << (i - base);
+        }
+        bitmap[base / 64] = word;
+    }
+}
+
+/**
+ * Checks once whether the running CPU supports AVX2.
+ */
+inline bool cpu_has_avx2() {
+    static const bool supported = __builtin_cpu_supports("avx2") != 0;
+    return supported;
+}
+
+#endif  // KANERVA_SDM_AVX2_DISPATCH
+
+/**
+ * Selects the Hamming scan kernel for an address width. Widths of 2, 4, 8 and
+ * 16 words (up to 128, 256, 512 and 1024 bits) use specialized kernels. Widths
+ * of four or more words use the AVX2 kernels when the CPU supports them.
+ *
+ * @param num_words Number of words per address.
+ *
+ * @return Scan kernel for that width.
+ */
+inline HammingScanFn select_hamming_scan(int num_words) {
+#if defined(KANERVA_SDM_AVX2_DISPATCH)
+    if (num_words >= 4 && cpu_has_avx2()) {
+        switch (num_words) {
+            case 4: return &hamming_scan_avx2<4>;
+            case 8: return &hamming_scan_avx2<8>;
+            case 16: return &hamming_scan_avx2<16>;
+            default: return &hamming_scan_avx2<0>;
+        }
+    }
+#endif
+    switch (num_words) {
+        case 2: return &hamming_scan<2>;
+        case 4: return &hamming_scan<4>;
+        case 8: return &hamming_scan<8>;
+        case 16: return &hamming_scan<16>;
+        default: return &hamming_scan<0>;
+    }
+}
+
+/**
+ * Names the Hamming scan kernel select_hamming_scan() picks for an address width.
+ *
+ * @param num_words Number of words per address.
+ *
+ * @return "avx2" or "scalar".
+ */
+inline const char* hamming_scan_name(int num_words) {
+#if defined(KANERVA_SDM_AVX2_DISPATCH)
+    if (num_words >= 4 && cpu_has_avx2()) {
+        return "avx2";
+    }
+#endif
+    return "scalar";
+}
+
+}  // namespace bit_ops
+
+#endif // KANERVA_SDM_BIT_OPS_H
@@ -14,12 +14,21 @@
 #ifndef KANERVA_SDM_H
 #define KANERVA_SDM_H
 
+#include <cstddef>
+#include <cstdint>
 #include <vector>
-#include <random>
 #include <stdexcept>
 #include <algorithm>
 #include <numeric>
 #include <string>
+#include <utility>
+#include <mutex>
+#include <condition_variable>
+#include <thread>
+#include <exception>
+#include <system_error>
+
+#include "kanerva_sdm/bit_ops.h"
 
 class KanervaSDM {
 public:
@@ -43,7 +52,9 @@ public:
           memory_dimension_(memory_dimension),
           num_locations_(num_locations),
           hamming_threshold_(hamming_threshold),
-          memory_count_(0) {
+          memory_count_(0),
+          address_words_(bit_ops::words_for_bits(address_dimension)),
+          hamming_scan_(bit_ops::select_hamming_scan(address_words_)) {
         
         if (address_dimension <= 0) {
             throw std::invalid_argument("Address dimension must be a positive integer.");
@@ -59,19 +70,28 @@ public:
         }
 
         // Initialize random number generator.
-        std::mt19937 rng(random_seed);
-        std::uniform_int_distribution<int> dist(0, 1);
+        bit_ops::Xoshiro256PlusPlus rng(random_seed);
 
-        // Initialize address matrix with random binary values.
-        address_matrix_.resize(num_locations_, std::vector<int>(address_dimension_));
+        // Initialize address matrix with random binary values, bit-packed per location.
+        // Each generator call fills a whole word; padding bits past address_dimension stay zero.
+        const int tail_bits = address_dimension_ % 64;
+        const uint64_t tail_mask = tail_bits ? (static_cast<uint64_t>(1) << tail_bits) - 1 : ~static_cast<uint64_t>(0);
+        address_matrix_.resize(static_cast<std::size_t>(num_locations_) * address_words_);
         for (int i = 0; i < num_locations_; ++i) {
-            for (int j = 0; j < address_dimension_; ++j) {
-                address_matrix_[i][j] = dist(rng);
+            uint64_t* location = &address_matrix_[static_cast<std::size_t>(i) * address_words_];
+            for (int w = 0; w < address_words_; ++w) {
+                location[w] = rng.next();
             }
+            location[address_words_ - 1] &= tail_mask;
+        }
+
+        // Index hard locations by address band when probing is cheaper than a full scan.
+        if (band_index_is_worthwhile()) {
+            build_band_index();
         }
 
         // Initialize memory matrix with zeros.
-        memory_matrix_.resize(num_locations_, std::vector<float>(memory_dimension_, 0.0f));
+        memory_matrix_.assign(static_cast<std::size_t>(memory_dimension_) * num_locations_, 0);
     }
 
     /**
@@ -86,17 +106,29 @@ public:
         validate_vector(address, "address", address_dimension_);
         validate_vector(memory, "memory", memory_dimension_);
 
-        std::vector<int> activated_locations = get_activated_locations(address);
+        std::vector<uint8_t> address_bytes(address.begin(), address.end());
+        std::vector<uint8_t> memory_bytes(memory.begin(), memory.end());
+        ExclusiveLock lock(counter_lock_);
+        write_validated(address_bytes.data(), memory_bytes.data());
+    }
 
-        // Convert memory to polar form and update memory matrix.
-        for (int loc : activated_locations) {
-            for (int i = 0; i < memory_dimension_; ++i) {
-                int polar_value = 2 * memory[i] - 1;  // Convert {0,1} to {-1,+1}.
-                memory_matrix_[loc][i] += polar_value;
-            }
-        }
+    /**
+     * Writes a memory to an address given as contiguous byte buffers.
+     *
+     * @param address Pointer to the target address vector (x).
+     * @param address_size Number of elements in address.
+     * @param memory Pointer to the memory vector (w).
+     * @param memory_size Number of elements in memory.
+     *
+     * @throws std::invalid_argument If address or memory buffers are invalid.
+     */
+    void write(const uint8_t* address, std::size_t address_size,
+               const uint8_t* memory, std::size_t memory_size) {
+        validate_buffer(address, address_size, "address", address_dimension_);
+        validate_buffer(memory, memory_size, "memory", memory_dimension_);
 
-        ++memory_count_;
+        ExclusiveLock lock(counter_lock_);
+        write_validated(address, memory);
     }
 
     /**
@@ -107,33 +139,142 @@ public:
      * @return Recalled memory vector (z) of size memory_dimension.
      *         Returns all zeros if no locations are activated.
      *
+     * Reads share the counter lock, so they run concurrently with each other and
+     * wait for any write or erase_memory() in progress.
+     *
      * @throws std::invalid_argument If address vector is invalid.
      */
-    std::vector<int> read(const std::vector<int>& address) {
+    std::vector<int> read(const std::vector<int>& address) const {
         validate_vector(address, "address", address_dimension_);
 
-        std::vector<int> activated_locations = get_activated_locations(address);
+        std::vector<uint8_t> address_bytes(address.begin(), address.end());
+        std::vector<uint8_t> result(memory_dimension_);
+        SharedLock lock(counter_lock_);
+        read_validated(address_bytes.data(), result.data());
 
-        // Return zeros if no locations activated.
-        if (activated_locations.empty()) {
-            return std::vector<int>(memory_dimension_, 0);
-        }
+        return std::vector<int>(result.begin(), result.end());
+    }
 
-        // Sum activated locations.
-        std::vector<float> locations_sum(memory_dimension_, 0.0f);
-        for (int loc : activated_locations) {
-            for (int i = 0; i < memory_dimension_; ++i) {
-                locations_sum[i] += memory_matrix_[loc][i];
-            }
+    /**
+     * Reads a memory from an address into a caller-provided buffer.
+     *
+     * @param address Target address vector (x) of size address_dimension.
+     * @param result Output buffer of size memory_dimension for the recalled
+     *               memory vector (z). Set to all zeros if no locations are activated.
+     *
+     * @throws std::invalid_argument If address vector is invalid.
+     */
+    void read(const std::vector<int>& address, uint8_t* result) const {
+        validate_vector(address, "address", address_dimension_);
+
+        std::vector<uint8_t> address_bytes(address.begin(), address.end());
+        SharedLock lock(counter_lock_);
+        read_validated(address_bytes.data(), result);
+    }
+
+    /**
+     * Reads a memory from an address given as a contiguous byte buffer.
+     *
+     * @param address Pointer to the target address vector (x).
+     * @param address_size Number of elements in address.
+     * @param result Output buffer of size memory_dimension for the recalled
+     *               memory vector (z). Set to all zeros if no locations are activated.
+     *
+     * @throws std::invalid_argument If address buffer is invalid.
+     */
+    void read(const uint8_t* address, std::size_t address_size, uint8_t* result) const {
+        validate_buffer(address, address_size, "address", address_dimension_);
+
+        SharedLock lock(counter_lock_);
+        read_validated(address, result);
+    }
+
+    /**
+     * Writes a batch of memories to a batch of addresses, in order.
+     *
+     * Equivalent to calling write() for each row, but validates the whole batch
+     * up front and streams the address matrix (A) once per batch: each tile of
+     * hard locations is scanned against every address before moving on.
+     *
+     * @param addresses Row-major num_addresses x address_size address matrix.
+     * @param num_addresses Number of address rows.
+     * @param address_size Number of elements per address row.
+     * @param memories Row-major num_memories x memory_size memory matrix.
+     * @param num_memories Number of memory rows.
+     * @param memory_size Number of elements per memory row.
+     *
+     * @throws std::invalid_argument If the batches differ in length or contain invalid vectors.
+     */
+    void write_many(const uint8_t* addresses, std::size_t num_addresses, std::size_t address_size,
+                    const uint8_t* memories, std::size_t num_memories, std::size_t memory_size) {
+        if (num_addresses != num_memories) {
+            throw std::invalid_argument(
+                "number of addresses (" + std::to_string(num_addresses) +
+                ") doesn't match number of memories (" + std::to_string(num_memories) + ")"
+            );
         }
+        validate_batch(addresses, num_addresses, address_size, "addresses", address_dimension_);
+        validate_batch(memories, num_memories, memory_size, "memories", memory_dimension_);
 
-        // Convert to binary output.
-        std::vector<int> result(memory_dimension_);
-        for (int i = 0; i < memory_dimension_; ++i) {
-            result[i] = (locations_sum[i] >= 0.0f) ? 1 : 0;
+        ExclusiveLock lock(counter_lock_);
+        write_many_validated(addresses, memories, static_cast<int>(num_addresses));
+    }
+
+    /**
+     * Reads a batch of memories from a batch of addresses.
+     *
+     * @param addresses Row-major num_addresses x address_size address matrix.
+     * @param num_addresses Number of address rows.
+     * @param address_size Number of elements per address row.
+     * @param results Output row-major num_addresses x memory_dimension matrix of
+     *                recalled memories (z).
+     *
+     * @throws std::invalid_argument If any address is invalid.
+     */
+    void read_many(const uint8_t* addresses, std::size_t num_addresses, std::size_t address_size,
+                   uint8_t* results) const {
+        validate_batch(addresses, num_addresses, address_size, "addresses", address_dimension_);
+
+        SharedLock lock(counter_lock_);
+
+        // Rows are independent, so large batches are split into contiguous blocks
+        // read on threads started for this call. No thread pool outlives the call,
+        // which keeps the extension safe to use across fork().
+        std::size_t num_threads = read_many_threads(num_addresses);
+        if (num_threads <= 1) {
+            read_rows(addresses, results, 0, num_addresses);
+            return;
         }
 
-        return result;
+        const std::size_t block = (num_addresses + num_threads - 1) / num_threads;
+        num_threads = (num_addresses + block - 1) / block;  // Drop threads left with no rows.
+        std::vector<std::exception_ptr> errors(num_threads);
+        std::vector<std::thread> workers;
+        workers.reserve(num_threads);
+        for (std::size_t t = 0; t < num_threads; ++t) {
+            const std::size_t begin = t * block;
+            const std::size_t end = std::min(num_addresses, begin + block);
+            auto read_block = [this, addresses, results, begin, end, t, &errors]() {
+                try {
+                    read_rows(addresses, results, begin, end);
+                } catch (...) {
+                    errors[t] = std::current_exception();
+                }
+            };
+            try {
+                workers.push_back(std::thread(read_block));
+            } catch (const std::system_error&) {
+                read_block();  // Out of threads; read this block on the calling thread.
+            }
+        }
+        for (std::size_t t = 0; t < workers.size(); ++t) {
+            workers[t].join();
+        }
+        for (std::size_t t = 0; t < num_threads; ++t) {
+            if (errors[t]) {
+                std::rethrow_exception(errors[t]);
+            }
+        }
     }
 
     /**
@@ -141,18 +282,87 @@ public:
      * so locations are preserved.
      */
     void erase_memory() {
-        for (auto& row : memory_matrix_) {
-            std::fill(row.begin(), row.end(), 0.0f);
-        }
+        ExclusiveLock lock(counter_lock_);
+        std::fill(memory_matrix_.begin(), memory_matrix_.end(), 0);
         memory_count_ = 0;
     }
 
+    /**
+     * Finds the hard locations activated by an address.
+     *
+     * @param address Target address vector (x) of size address_dimension.
+     *
+     * @return Ascending indices of locations within Hamming distance H of the address.
+     *
+     * @throws std::invalid_argument If address vector is invalid.
+     */
+    std::vector<int> activated_locations(const std::vector<int>& address) const {
+        validate_vector(address, "address", address_dimension_);
+
+        std::vector<uint8_t> address_bytes(address.begin(), address.end());
+        return get_activated_locations(address_bytes.data());
+    }
+
+    /**
+     * Finds the hard locations activated by an address given as a contiguous byte buffer.
+     *
+     * @param address Pointer to the target address vector (x).
+     * @param address_size Number of elements in address.
+     *
+     * @return Ascending indices of locations within Hamming distance H of the address.
+     *
+     * @throws std::invalid_argument If address buffer is invalid.
+     */
+    std::vector<int> activated_locations(const uint8_t* address, std::size_t address_size) const {
+        validate_buffer(address, address_size, "address", address_dimension_);
+
+        return get_activated_locations(address);
+    }
+
+    /**
+     * Unpacks the address matrix (A).
+     *
+     * @return Row-major num_locations x address_dimension matrix of 0s and 1s.
+     */
+    std::vector<uint8_t> get_address_matrix() const {
+        std::vector<uint8_t> matrix(static_cast<std::size_t>(num_locations_) * address_dimension_);
+        for (int i = 0; i < num_locations_; ++i) {
+            const uint64_t* location = &address_matrix_[static_cast<std::size_t>(i) * address_words_];
+            uint8_t* row = &matrix[static_cast<std::size_t>(i) * address_dimension_];
+            for (int j = 0; j < address_dimension_; ++j) {
+                row[j] = static_cast<uint8_t>((location[j / 64] >> (j % 64)) & 1);
+            }
+        }
+        return matrix;
+    }
+
+    /**
+     * Hashes the bit-packed address matrix (A), to pin the hard locations a seed produces.
+     *
+     * @return 64-bit FNV-1a hash of the packed address words.
+     */
+    uint64_t get_address_matrix_digest() const {
+        return bit_ops::fnv1a_hash(address_matrix_.data(), address_matrix_.size());
+    }
+
+    /**
+     * Names the Hamming scan kernel this instance uses.
+     *
+     * @return "avx2" or "scalar".
+     */
+    std::string get_scan_kernel() const {
+        return bit_ops::hamming_scan_name(address_words_);
+    }
+
     // Getters for accessing dimensions and count.
     int get_address_dimension() const { return address_dimension_; }
     int get_memory_dimension() const { return memory_dimension_; }
     int get_num_locations() const { return num_locations_; }
     int get_hamming_threshold() const { return hamming_threshold_; }
-    int get_memory_count() const { return memory_count_; }
+    int get_memory_count() const {
+        SharedLock lock(counter_lock_);
+        return memory_count_;
+    }
 
 private:
     int address_dimension_;      // Length of addresses (N).
@@ -160,9 +370,294 @@ private:
     int num_locations_;          // Number of locations (M).
     int hamming_threshold_;   // Hamming activation threshold (H).
     int memory_count_;           // Number of stored memories (T).
+    int address_words_;          // 64-bit words per packed address.
+    bit_ops::HammingScanFn hamming_scan_;  // Scan kernel specialized for address_words_.
 
-    std::vector<std::vector<int>> address_matrix_;  // Hard locations (A).
-    std::vector<std::vector<float>> memory_matrix_; // Memory counters (C).
+    std::vector<uint64_t> address_matrix_;  // Hard locations (A), bit-packed row-major.
+    std::vector<int8_t> memory_matrix_;     // Memory counters (C), one row of locations per dimension.
+
+    static const int counter_limit_ = 127;  // Counters saturate at +/- this value.
+    static const int scan_tile_ = 512;      // Locations per scan tile, a multiple of 64.
+    static const int read_thread_work_ = 1 << 18;  // Minimum location comparisons per read_many thread.
+
+    /**
+     * Reader-writer lock guarding the memory counters (C) and memory count (T).
+     *
+     * C++11 has no shared_mutex, so this counts readers under a std::mutex.
+     * A waiting writer blocks new readers, so a stream of reads cannot starve
+     * writes. Copies start unlocked.
+     */
+    class CounterLock {
+    public:
+        CounterLock() : readers_(0), writer_(false) {}
+        CounterLock(const CounterLock&) : readers_(0), writer_(false) {}
+        CounterLock& operator=(const CounterLock&) { return *this; }
+
+        void lock_shared() {
+            std::unique_lock<std::mutex> lock(mutex_);
+            while (writer_) {
+                released_.wait(lock);
+            }
+            ++readers_;
+        }
+
+        void unlock_shared() {
+            std::lock_guard<std::mutex> lock(mutex_);
+            if (--readers_ == 0) {
+                released_.notify_all();
+            }
+        }
+
+        void lock() {
+            std::unique_lock<std::mutex> lock(mutex_);
+            while (writer_) {
+                released_.wait(lock);
+            }
+            writer_ = true;
+            while (readers_ > 0) {
+                released_.wait(lock);
+            }
+        }
+
+        void unlock() {
+            std::lock_guard<std::mutex> lock(mutex_);
+            writer_ = false;
+            released_.notify_all();
+        }
+
+    private:
+        std::mutex mutex_;
+        std::condition_variable released_;
+        int readers_;   // Readers holding the lock.
+        bool writer_;   // True while a writer holds or is waiting for the lock.
+    };
+
+    // Holds a CounterLock shared for the lifetime of the guard.
+    class SharedLock {
+    public:
+        explicit SharedLock(CounterLock& lock) : lock_(lock) { lock_.lock_shared(); }
+        ~SharedLock() { lock_.unlock_shared(); }
+
+    private:
+        SharedLock(const SharedLock&);
+        SharedLock& operator=(const SharedLock&);
+        CounterLock& lock_;
+    };
+
+    typedef std::lock_guard<CounterLock> ExclusiveLock;
+
+    // Taken shared by reads and exclusively by writes and erase_memory().
+    mutable CounterLock counter_lock_;
+
+    // Multi-index over hard locations (A), one sorted run of M entries per band:
+    // band_values_ holds word b of every address in ascending order and
+    // band_locations_ the matching location indices. Empty when a full scan is cheaper.
+    std::vector<uint64_t> band_values_;
+    std::vector<int> band_locations_;
+
+    /**
+     * Adds a polar value to a counter, saturating at +/- counter_limit_.
+     *
+     * @param counter Current counter value.
+     * @param polar_value Value to add, -1 or +1.
+     *
+     * @return Updated counter value.
+     */
+    static int8_t saturating_add(int8_t counter, int polar_value) {
+        const int limit = counter_limit_;
+        int value = counter + polar_value;
+        value = value > limit ? limit : value;
+        value = value < -limit ? -limit : value;
+        return static_cast<int8_t>(value);
+    }
+
+    /**
+     * Returns the counters of all locations for one memory dimension.
+     *
+     * @param dimension Memory dimension index.
+     *
+     * @return Pointer to num_locations counters.
+     */
+    int8_t* memory_row(int dimension) {
+        return &memory_matrix_[static_cast<std::size_t>(dimension) * num_locations_];
+    }
+
+    const int8_t* memory_row(int dimension) const {
+        return &memory_matrix_[static_cast<std::size_t>(dimension) * num_locations_];
+    }
+
+    /**
+     * Adds a validated memory to all locations activated by a validated address.
+     *
+     * @param address Target address vector (x) of size address_dimension.
+     * @param memory Memory vector (w) of size memory_dimension.
+     */
+    void write_validated(const uint8_t* address, const uint8_t* memory) {
+        std::vector<int> activated_locations = get_activated_locations(address);
+        add_memory(activated_locations, memory);
+
+        ++memory_count_;
+    }
+
+    /**
+     * Writes a validated batch of memories, tiling over hard locations so each
+     * tile of the address matrix (A) is scanned against every address while cached.
+     * Each location still receives the memories in batch order.
+     *
+     * @param addresses Row-major count x address_dimension address matrix.
+     * @param memories Row-major count x memory_dimension memory matrix.
+     * @param count Number of rows.
+     */
+    void write_many_validated(const uint8_t* addresses, const uint8_t* memories, int count) {
+        if (!band_values_.empty()) {
+            // The band index already avoids scanning A.
+            for (int row = 0; row < count; ++row) {
+                write_validated(addresses + static_cast<std::size_t>(row) * address_dimension_,
+                                memories + static_cast<std::size_t>(row) * memory_dimension_);
+            }
+            return;
+        }
+
+        // Pack every address once up front.
+        std::vector<uint64_t> packed_addresses(static_cast<std::size_t>(count) * address_words_);
+        for (int row = 0; row < count; ++row) {
+            bit_ops::pack_bits(addresses + static_cast<std::size_t>(row) * address_dimension_,
+                               address_dimension_,
+                               &packed_addresses[static_cast<std::size_t>(row) * address_words_]);
+        }
+
+        std::vector<uint64_t> tile_bitmap(scan_tile_ / 64);
+        std::vector<int> activated_locations;
+        for (int tile = 0; tile < num_locations_; tile += scan_tile_) {
+            const int tile_locations = std::min(num_locations_ - tile, static_cast<int>(scan_tile_));
+            const int tile_words = bit_ops::words_for_bits(tile_locations);
+            for (int row = 0; row < count; ++row) {
+                hamming_scan_(&packed_addresses[static_cast<std::size_t>(row) * address_words_],
+                              &address_matrix_[static_cast<std::size_t>(tile) * address_words_],
+                              tile_locations, address_words_, hamming_threshold_, tile_bitmap.data());
+                activated_locations.clear();
+                bit_ops::append_set_bits(tile_bitmap.data(), tile_words, tile, activated_locations);
+                add_memory(activated_locations, memories + static_cast<std::size_t>(row) * memory_dimension_);
+            }
+        }
+
+        memory_count_ += count;
+    }
+
+    /**
+     * Adds a memory in polar form to the counters of the given locations.
+     *
+     * @param locations Indices of the locations to update.
+     * @param memory Memory vector (w) of size memory_dimension.
+     */
+    void add_memory(const std::vector<int>& locations, const uint8_t* memory) {
+        for (int i = 0; i < memory_dimension_; ++i) {
+            int polar_value = 2 * memory[i] - 1;  // Convert {0,1} to {-1,+1}.
+            int8_t* row = memory_row(i);
+            for (int loc : locations) {
+                row[loc] = saturating_add(row[loc], polar_value);
+            }
+        }
+    }
+
+    /**
+     * Reads a block of validated address rows.
+     *
+     * @param addresses Row-major address matrix with rows of address_dimension.
+     * @param results Row-major output matrix with rows of memory_dimension.
+     * @param begin First row to read.
+     * @param end One past the last row to read.
+     */
+    void read_rows(const uint8_t* addresses, uint8_t* results, std::size_t begin, std::size_t end) const {
+        for (std::size_t row = begin; row < end; ++row) {
+            read_validated(addresses + row * address_dimension_, results + row * memory_dimension_);
+        }
+    }
+
+    /**
+     * Chooses how many threads read_many() uses for a batch.
+     *
+     * Each thread gets at least read_thread_work_ location comparisons, so small
+     * batches and small memories are read on the calling thread.
+     *
+     * @param num_addresses Number of rows in the batch.
+     *
+     * @return Number of threads, at least 1.
+     */
+    std::size_t read_many_threads(std::size_t num_addresses) const {
+        const std::size_t work = num_addresses * static_cast<std::size_t>(num_locations_);
+        const std::size_t by_work = work / static_cast<std::size_t>(read_thread_work_);
+        const std::size_t hardware = std::thread::hardware_concurrency();
+        std::size_t threads = std::min(num_addresses, std::min(by_work, hardware));
+        return threads > 0 ? threads : 1;
+    }
+
+    /**
+     * Recalls the memory stored around a validated address.
+     *
+     * Without the band index, activation and summation are fused per tile of
+     * scan_tile_ locations: each tile's addresses are scanned and its activated
+     * counters summed while both are still cached.
+     *
+     * @param address Target address vector (x) of size address_dimension.
+     * @param result Output buffer of size memory_dimension for the recalled memory (z).
+     */
+    void read_validated(const uint8_t* address, uint8_t* result) const {
+        std::vector<int32_t> locations_sum(memory_dimension_, 0);
+        int activated_count = 0;
+
+        if (!band_values_.empty()) {
+            std::vector<int> activated_locations = get_activated_locations(address);
+            sum_locations(activated_locations, locations_sum.data());
+            activated_count = static_cast<int>(activated_locations.size());
+        } else {
+            std::vector<uint64_t> packed_address(address_words_);
+            bit_ops::pack_bits(address, address_dimension_, packed_address.data());
+
+            std::vector<uint64_t> tile_bitmap(scan_tile_ / 64);
+            std::vector<int> activated_locations;
+            for (int tile = 0; tile < num_locations_; tile += scan_tile_) {
+                const int tile_locations = std::min(num_locations_ - tile, static_cast<int>(scan_tile_));
+                hamming_scan_(packed_address.data(),
+                              &address_matrix_[static_cast<std::size_t>(tile) * address_words_],
+                              tile_locations, address_words_, hamming_threshold_, tile_bitmap.data());
+                activated_locations.clear();
+                bit_ops::append_set_bits(tile_bitmap.data(), bit_ops::words_for_bits(tile_locations),
+                                         tile, activated_locations);
+                sum_locations(activated_locations, locations_sum.data());
+                activated_count += static_cast<int>(activated_locations.size());
+            }
+        }
+
+        // Return zeros if no locations activated.
+        if (activated_count == 0) {
+            std::fill(result, result + memory_dimension_, 0);
+            return;
+        }
+
+        // Convert to binary output (ties at zero read as 1).
+        bit_ops::sign_to_bits(locations_sum.data(), memory_dimension_, result);
+    }
+
+    /**
+     * Adds the counters of the given locations to a running sum per memory dimension.
+     *
+     * @param locations Indices of the locations to sum.
+     * @param locations_sum Running sums of size memory_dimension.
+     */
+    void sum_locations(const std::vector<int>& locations, int32_t* locations_sum) const {
+        if (locations.empty()) {
+            return;
+        }
+        for (int i = 0; i < memory_dimension_; ++i) {
+            const int8_t* row = memory_row(i);
+            int32_t sum = 0;
+            for (int loc : locations) {
+                sum += row[loc];
+            }
+            locations_sum[i] += sum;
+        }
+    }
 
     /**
      * Finds activated locations based on Hamming distance threshold (H).
@@ -170,30 +665,161 @@ private:
      * @param address Target address vector (x) of size address_dimension.
      *
      * @return Vector of indices for activated locations (y).
-     *
-     * @throws std::invalid_argument If address shape doesn't match address_dimension.
      */
-    std::vector<int> get_activated_locations(const std::vector<int>& address) {
+    std::vector<int> get_activated_locations(const uint8_t* address) const {
+        // Pack the query once so each comparison is XOR and popcount per word.
+        std::vector<uint64_t> packed_address(address_words_);
+        bit_ops::pack_bits(address, address_dimension_, packed_address.data());
+
+        if (!band_values_.empty()) {
+            return probe_activation(packed_address.data());
+        }
+
+        const int bitmap_words = bit_ops::words_for_bits(num_locations_);
+        std::vector<uint64_t> activation_bitmap(bitmap_words);
+        scan_activation(packed_address.data(), activation_bitmap.data());
+
+        // Materialize only the set bits, so callers iterate over activated locations alone.
         std::vector<int> activated_locations;
+        activated_locations.reserve(bit_ops::popcount_bitmap(activation_bitmap.data(), bitmap_words));
+        bit_ops::append_set_bits(activation_bitmap.data(), bitmap_words, 0, activated_locations);
 
-        for (int i = 0; i < num_locations_; ++i) {
-            // Calculate Hamming distance.
-            int hamming_distance = 0;
-            for (int j = 0; j < address_dimension_; ++j) {
-                if (address_matrix_[i][j] != address[j]) {
-                    ++hamming_distance;
-                }
+        return activated_locations;
+    }
+
+    /**
+     * Computes the Hamming distance from a packed query to every hard location
+     * and records which locations fall within the threshold (H).
+     *
+     * @param packed_address Bit-packed target address of address_words_ words.
+     * @param activation_bitmap Output bitmap with one bit per location, set if activated.
+     */
+    void scan_activation(const uint64_t* packed_address, uint64_t* activation_bitmap) const {
+        hamming_scan_(packed_address, address_matrix_.data(), num_locations_,
+                      address_words_, hamming_threshold_, activation_bitmap);
+    }
+
+    /**
+     * Width in bits of an address band. Each band is one word of the packed address.
+     *
+     * @param band Band index.
+     *
+     * @return Number of address bits in the band.
+     */
+    int band_width(int band) const {
+        return std::min(64, address_dimension_ - band * 64);
+    }
+
+    /**
+     * Hamming radius searched within each band. By the pigeonhole principle, an
+     * address within H of the query is within H / bands of it in at least one band.
+     */
+    int band_radius() const {
+        return hamming_threshold_ / address_words_;
+    }
+
+    /**
+     * Estimates whether probing the band index beats scanning every location.
+     * A probe enumerates every band value within band_radius() of the query band,
+     * and one binary search is costed as roughly 16 popcount comparisons. The index
+     * itself takes 12 bytes per location per band, 1.5 times the address matrix.
+     *
+     * @return True if the band index should be built.
+     */
+    bool band_index_is_worthwhile() const {
+        double probes = 0.0;
+        for (int band = 0; band < address_words_; ++band) {
+            double combinations = 1.0;  // C(width, k) for k = 0..radius.
+            for (int k = 0; k <= band_radius() && k <= band_width(band); ++k) {
+                probes += combinations;
+                combinations = combinations * (band_width(band) - k) / (k + 1);
             }
+        }
+        return probes * 16.0 <= num_locations_;
+    }
 
-            // Check if location is activated.
-            if (hamming_distance <= hamming_threshold_) {
-                activated_locations.push_back(i);
+    /**
+     * Builds the multi-index over the address matrix (A) by sorting each band's
+     * (value, location) pairs.
+     */
+    void build_band_index() {
+        const std::size_t locations = static_cast<std::size_t>(num_locations_);
+        band_values_.resize(locations * address_words_);
+        band_locations_.resize(locations * address_words_);
+
+        std::vector<std::pair<uint64_t, int>> entries(locations);
+        for (int band = 0; band < address_words_; ++band) {
+            for (int i = 0; i < num_locations_; ++i) {
+                entries[i] = std::make_pair(
+                    address_matrix_[static_cast<std::size_t>(i) * address_words_ + band], i);
+            }
+            std::sort(entries.begin(), entries.end());
+
+            const std::size_t offset = static_cast<std::size_t>(band) * locations;
+            for (std::size_t i = 0; i < locations; ++i) {
+                band_values_[offset + i] = entries[i].first;
+                band_locations_[offset + i] = entries[i].second;
             }
         }
+    }
+
+    /**
+     * Finds activated locations through the band index instead of a full scan.
+     *
+     * @param packed_address Bit-packed target address of address_words_ words.
+     *
+     * @return Ascending indices of activated locations.
+     */
+    std::vector<int> probe_activation(const uint64_t* packed_address) const {
+        std::vector<int> activated_locations;
+        for (int band = 0; band < address_words_; ++band) {
+            probe_band(band, packed_address[band], 0, band_radius(),
+                       packed_address, activated_locations);
+        }
 
+        // A location may match in several bands.
+        std::sort(activated_locations.begin(), activated_locations.end());
+        activated_locations.erase(
+            std::unique(activated_locations.begin(), activated_locations.end()),
+            activated_locations.end());
         return activated_locations;
     }
 
+    /**
+     * Looks up one band value, then recurses on every value that flips one more
+     * bit at or above first_bit, so each value within the radius is visited once.
+     * Candidates are verified against the full address before being activated.
+     *
+     * @param band Band index.
+     * @param band_value Band value to look up.
+     * @param first_bit Lowest bit that may still be flipped.
+     * @param radius Number of bits that may still be flipped.
+     * @param packed_address Bit-packed target address of address_words_ words.
+     * @param activated_locations List to append activated location indices to.
+     */
+    void probe_band(int band, uint64_t band_value, int first_bit, int radius,
+                    const uint64_t* packed_address, std::vector<int>& activated_locations) const {
+        const std::size_t offset = static_cast<std::size_t>(band) * num_locations_;
+        const uint64_t* band_begin = band_values_.data() + offset;
+        const std::pair<const uint64_t*, const uint64_t*> range =
+            std::equal_range(band_begin, band_begin + num_locations_, band_value);
+        for (const uint64_t* it = range.first; it != range.second; ++it) {
+            const int i = band_locations_[offset + (it - band_begin)];
+            const uint64_t* location = &address_matrix_[static_cast<std::size_t>(i) * address_words_];
+            if (bit_ops::hamming_distance(packed_address, location, address_words_) <= hamming_threshold_) {
+                activated_locations.push_back(i);
+            }
+        }
+
+        if (radius == 0) {
+            return;
+        }
+        for (int b = first_bit; b < band_width(band); ++b) {
+            probe_band(band, band_value ^ (static_cast<uint64_t>(1) << b), b + 1, radius - 1,
+                       packed_address, activated_locations);
+        }
+    }
+
     /**
      * Validates that an address vector or memory vector has the correct dimension
      * and contains only binary values.
@@ -206,7 +832,7 @@ private:
      */
     void validate_vector(const std::vector<int>& vector, 
                         const std::string& vector_name, 
-                        int expected_dimension) {
+                        int expected_dimension) const {
         if (static_cast<int>(vector.size()) != expected_dimension) {
             throw std::invalid_argument(
                 vector_name + " size " + std::to_string(vector.size()) + 
@@ -214,10 +840,75 @@ private:
             );
         }
 
-        for (int val : vector) {
-            if (val != 0 && val != 1) {
-                throw std::invalid_argument(vector_name + " must contain only 0s and 1s");
-            }
+        if (!bit_ops::is_binary(vector.data(), vector.size())) {
+            throw std::invalid_argument(vector_name + " must contain only 0s and 1s");
+        }
+    }
+
+    /**
+     * Validates that an address buffer or memory buffer has the correct size
+     * and contains only binary values.
+     *
+     * @param buffer Pointer to the buffer to validate.
+     * @param size Number of elements in the buffer.
+     * @param buffer_name Name of the buffer for error message.
+     * @param expected_dimension Expected size of the buffer.
+     *
+     * @throws std::invalid_argument If buffer size is incorrect or contains non-binary values.
+     */
+    void validate_buffer(const uint8_t* buffer,
+                         std::size_t size,
+                         const std::string& buffer_name,
+                         int expected_dimension) const {
+        if (size != static_cast<std::size_t>(expected_dimension)) {
+            throw std::invalid_argument(
+                buffer_name + " size " + std::to_string(size) +
+                " doesn't match expected (" + std::to_string(expected_dimension) + ")"
+            );
+        }
+
+        validate_binary(buffer, size, buffer_name);
+    }
+
+    /**
+     * Validates that a batch of address or memory vectors has the correct row size
+     * and contains only binary values.
+     *
+     * @param buffer Pointer to the row-major batch to validate.
+     * @param rows Number of rows in the batch.
+     * @param row_size Number of elements per row.
+     * @param buffer_name Name of the batch for error message.
+     * @param expected_dimension Expected size of each row.
+     *
+     * @throws std::invalid_argument If row size is incorrect or the batch contains non-binary values.
+     */
+    void validate_batch(const uint8_t* buffer,
+                        std::size_t rows,
+                        std::size_t row_size,
+                        const std::string& buffer_name,
+                        int expected_dimension) const {
+        if (row_size != static_cast<std::size_t>(expected_dimension)) {
+            throw std::invalid_argument(
+                buffer_name + " row size " + std::to_string(row_size) +
+                " doesn't match expected (" + std::to_string(expected_dimension) + ")"
+            );
+        }
+
+        validate_binary(buffer, rows * row_size, buffer_name);
+    }
+
+    /**
+     * Validates that a buffer contains only binary values.
+     *
+     * @param buffer Pointer to the buffer to validate.
+     * @param size Number of elements in the buffer.
+     * @param buffer_name Name of the buffer for error message.
+     *
+     * @throws std::invalid_argument If the buffer contains non-binary values.
+     */
+    static void validate_binary(const uint8_t* buffer, std::size_t size, const std::string& buffer_name) {
+        if (!bit_ops::is_binary(buffer, size)) {
+            throw std::invalid_argument(buffer_name + " must contain only 0s and 1s");
         }
     }
 };
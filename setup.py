@@ -8,12 +8,24 @@ from setuptools import setup, Extension, find_packages
 from pybind11.setup_helpers import Pybind11Extension, build_ext
 import sys
 import os
+import platform
 
 __version__ = "1.0.1"
 
 # Get the directory containing setup.py
 here = os.path.abspath(os.path.dirname(__file__))
 
+# Hamming distances use hardware popcount; every x86-64 CPU since 2008 has it.
+extra_compile_args = []
+if platform.machine().lower() in ("x86_64", "amd64") and sys.platform != "win32":
+    extra_compile_args.append("-mpopcnt")
+
+# read_many starts std::thread workers, which older glibc only links with -pthread.
+extra_link_args = []
+if sys.platform.startswith("linux"):
+    extra_compile_args.append("-pthread")
+    extra_link_args.append("-pthread")
+
 ext_modules = [
     Pybind11Extension(
         "kanerva_sdm._kanerva_sdm",
@@ -22,6 +34,8 @@ ext_modules = [
             os.path.join(here, "include"),
         ],
         define_macros=[("VERSION_INFO", f'"{__version__}"')],
+        extra_compile_args=extra_compile_args,
+        extra_link_args=extra_link_args,
         cxx_std=11,
     ),
 ]
@@ -44,13 +58,6 @@ setup(
     cmdclass={"build_ext": build_ext},
     zip_safe=False,
     python_requires=">=3.7",
-    install_requires=[
-        "pybind11>=2.6.0",
-    ],
-    extras_require={
-        "test": ["pytest>=6.0"],
-        "dev": ["pytest>=6.0", "black", "flake8"],
-    },
     classifiers=[
         "Development Status :: 3 - Alpha",
         "Intended Audience :: Science/Research",
@@ -5,11 +5,50 @@
  */
 
 #include <pybind11/pybind11.h>
+#include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 #include "kanerva_sdm/kanerva_sdm.h"
 
 namespace py = pybind11;
 
+// C-contiguous uint8 array. Bound with noconvert() so other arrays and sequences
+// fall through to the std::vector<int> overloads and their element validation.
+using BinaryArray = py::array_t<uint8_t, py::array::c_style>;
+
+/**
+ * Checks that an array argument is one-dimensional.
+ *
+ * @param array Array to check.
+ * @param array_name Name of the array for error message.
+ *
+ * @throws std::invalid_argument If the array is not one-dimensional.
+ */
+static void require_1d(const BinaryArray& array, const std::string& array_name) {
+    if (array.ndim() != 1) {
+        throw std::invalid_argument(
+            array_name + " must be one-dimensional, got " +
+            std::to_string(array.ndim()) + " dimensions"
+        );
+    }
+}
+
+/**
+ * Checks that an array argument is two-dimensional.
+ *
+ * @param array Array to check.
+ * @param array_name Name of the array for error message.
+ *
+ * @throws std::invalid_argument If the array is not two-dimensional.
+ */
+static void require_2d(const BinaryArray& array, const std::string& array_name) {
+    if (array.ndim() != 2) {
+        throw std::invalid_argument(
+            array_name + " must be two-dimensional, got " +
+            std::to_string(array.ndim()) + " dimensions"
+        );
+    }
+}
+
 PYBIND11_MODULE(_kanerva_sdm, m) {
     m.doc() = "Sparse Distributed Memory implementation based on Kanerva (1992)";
 
@@ -38,42 +77,197 @@ PYBIND11_MODULE(_kanerva_sdm, m) {
              "ValueError\n"
              "    If any dimension or threshold is non-positive.")
         
-        .def("write", &KanervaSDM::write,
+        .def("write",
+             [](KanervaSDM& sdm, const BinaryArray& address, const BinaryArray& memory) {
+                 require_1d(address, "address");
+                 require_1d(memory, "memory");
+                 py::gil_scoped_release release;
+                 sdm.write(address.data(), static_cast<std::size_t>(address.size()),
+                           memory.data(), static_cast<std::size_t>(memory.size()));
+             },
+             py::arg("address").noconvert(),
+             py::arg("memory").noconvert())
+        .def("write",
+             static_cast<void (KanervaSDM::*)(const std::vector<int>&, const std::vector<int>&)>(
+                 &KanervaSDM::write),
              py::arg("address"),
              py::arg("memory"),
+             py::call_guard<py::gil_scoped_release>(),
              "Write a memory to an address.\n\n"
              "Parameters\n"
              "----------\n"
-             "address : list of int\n"
+             "address : numpy.ndarray of uint8 or list of int\n"
              "    Target address vector (x) of size address_dimension.\n"
              "    Must contain only 0s and 1s.\n"
-             "memory : list of int\n"
+             "memory : numpy.ndarray of uint8 or list of int\n"
              "    Memory vector (w) of size memory_dimension.\n"
              "    Must contain only 0s and 1s.\n\n"
              "Raises\n"
              "------\n"
              "ValueError\n"
-             "    If address or memory vectors have incorrect size or contain non-binary values.")
+             "    If address or memory vectors have incorrect size or contain non-binary values.\n\n"
+             "Notes\n"
+             "-----\n"
+             "The GIL is released while writing. Writes take the SDM's lock exclusively,\n"
+             "so they wait for reads in progress and block new reads until done.")
         
-        .def("read", &KanervaSDM::read,
+        .def("read",
+             [](const KanervaSDM& sdm, const BinaryArray& address) {
+                 require_1d(address, "address");
+                 py::array_t<uint8_t> result(sdm.get_memory_dimension());
+                 uint8_t* result_data = result.mutable_data();
+                 {
+                     py::gil_scoped_release release;
+                     sdm.read(address.data(), static_cast<std::size_t>(address.size()), result_data);
+                 }
+                 return result;
+             },
+             py::arg("address").noconvert())
+        .def("read",
+             [](const KanervaSDM& sdm, const std::vector<int>& address) {
+                 py::array_t<uint8_t> result(sdm.get_memory_dimension());
+                 uint8_t* result_data = result.mutable_data();
+                 {
+                     py::gil_scoped_release release;
+                     sdm.read(address, result_data);
+                 }
+                 return result;
+             },
              py::arg("address"),
              "Read a memory from an address.\n\n"
              "Parameters\n"
              "----------\n"
-             "address : list of int\n"
+             "address : numpy.ndarray of uint8 or list of int\n"
              "    Target address vector (x) of size address_dimension.\n"
              "    Must contain only 0s and 1s.\n\n"
              "Returns\n"
              "-------\n"
-             "list of int\n"
-             "    Recalled memory vector (z) of size memory_dimension.\n"
+             "numpy.ndarray of uint8\n"
+             "    Recalled memory vector (z), shape (memory_dimension,).\n"
              "    Returns all zeros if no locations are activated.\n\n"
              "Raises\n"
              "------\n"
              "ValueError\n"
+             "    If address vector has incorrect size or contains non-binary values.\n\n"
+             "Notes\n"
+             "-----\n"
+             "The GIL is released while reading, so reads from several threads run\n"
+             "in parallel. Reads share the SDM's lock and wait for writes in progress.")
+        
+        .def("write_many",
+             [](KanervaSDM& sdm, const BinaryArray& addresses, const BinaryArray& memories) {
+                 require_2d(addresses, "addresses");
+                 require_2d(memories, "memories");
+                 py::gil_scoped_release release;
+                 sdm.write_many(addresses.data(), static_cast<std::size_t>(addresses.shape(0)),
+                                static_cast<std::size_t>(addresses.shape(1)),
+                                memories.data(), static_cast<std::size_t>(memories.shape(0)),
+                                static_cast<std::size_t>(memories.shape(1)));
+             },
+             py::arg("addresses").noconvert(),
+             py::arg("memories").noconvert(),
+             "Write a batch of memories to a batch of addresses.\n\n"
+             "Equivalent to calling write() on each row in order, with a single\n"
+             "call and validation pass for the whole batch.\n\n"
+             "Parameters\n"
+             "----------\n"
+             "addresses : numpy.ndarray of uint8, C-contiguous\n"
+             "    Address vectors (x), shape (n, address_dimension).\n"
+             "    Must contain only 0s and 1s.\n"
+             "memories : numpy.ndarray of uint8, C-contiguous\n"
+             "    Memory vectors (w), shape (n, memory_dimension).\n"
+             "    Must contain only 0s and 1s.\n\n"
+             "Raises\n"
+             "------\n"
+             "ValueError\n"
+             "    If the arrays have incorrect shapes or contain non-binary values.")
+        
+        .def("read_many",
+             [](const KanervaSDM& sdm, const BinaryArray& addresses) {
+                 require_2d(addresses, "addresses");
+                 py::array_t<uint8_t> results(
+                     {static_cast<py::ssize_t>(addresses.shape(0)),
+                      static_cast<py::ssize_t>(sdm.get_memory_dimension())});
+                 uint8_t* results_data = results.mutable_data();
+                 {
+                     py::gil_scoped_release release;
+                     sdm.read_many(addresses.data(), static_cast<std::size_t>(addresses.shape(0)),
+                                   static_cast<std::size_t>(addresses.shape(1)), results_data);
+                 }
+                 return results;
+             },
+             py::arg("addresses").noconvert(),
+             "Read a batch of memories from a batch of addresses.\n\n"
+             "Parameters\n"
+             "----------\n"
+             "addresses : numpy.ndarray of uint8, C-contiguous\n"
+             "    Address vectors (x), shape (n, address_dimension).\n"
+             "    Must contain only 0s and 1s.\n\n"
+             "Returns\n"
+             "-------\n"
+             "numpy.ndarray of uint8\n"
+             "    Recalled memory vectors (z), shape (n, memory_dimension).\n"
+             "    Rows are all zeros where no locations are activated.\n\n"
+             "Raises\n"
+             "------\n"
+             "ValueError\n"
+             "    If the array has an incorrect shape or contains non-binary values.")
+        
+        .def("activated_locations",
+             [](const KanervaSDM& sdm, const BinaryArray& address) {
+                 require_1d(address, "address");
+                 std::vector<int> locations;
+                 {
+                     py::gil_scoped_release release;
+                     locations = sdm.activated_locations(
+                         address.data(), static_cast<std::size_t>(address.size()));
+                 }
+                 return py::array_t<int32_t>(locations.size(), locations.data());
+             },
+             py::arg("address").noconvert())
+        .def("activated_locations",
+             [](const KanervaSDM& sdm, const std::vector<int>& address) {
+                 std::vector<int> locations;
+                 {
+                     py::gil_scoped_release release;
+                     locations = sdm.activated_locations(address);
+                 }
+                 return py::array_t<int32_t>(locations.size(), locations.data());
+             },
+             py::arg("address"),
+             "Find the hard locations activated by an address.\n\n"
+             "Parameters\n"
+             "----------\n"
+             "address : numpy.ndarray of uint8 or list of int\n"
+             "    Target address vector (x) of size address_dimension.\n"
+             "    Must contain only 0s and 1s.\n\n"
+             "Returns\n"
+             "-------\n"
+             "numpy.ndarray of int32\n"
+             "    Ascending indices of locations within Hamming distance H of the address.\n\n"
+             "Raises\n"
+             "------\n"
+             "ValueError\n"
              "    If address vector has incorrect size or contains non-binary values.")
         
+        .def("_address_matrix",
+             [](const KanervaSDM& sdm) {
+                 std::vector<uint8_t> matrix = sdm.get_address_matrix();
+                 return py::array_t<uint8_t>(
+                     {sdm.get_num_locations(), sdm.get_address_dimension()}, matrix.data());
+             },
+             "Return a copy of the address matrix (A) as a num_locations x address_dimension\n"
+             "uint8 array. Intended for testing and inspection.")
+        
+        .def("_address_matrix_digest", &KanervaSDM::get_address_matrix_digest,
+             "Return a 64-bit hash of the bit-packed address matrix (A).\n"
+             "Intended for checking that a seed reproduces the same hard locations.")
+        
+        .def_property_readonly("_scan_kernel", &KanervaSDM::get_scan_kernel,
+                               "Name of the Hamming scan kernel in use (\"avx2\" or \"scalar\").")
+        
         .def("erase_memory", &KanervaSDM::erase_memory,
+             py::call_guard<py::gil_scoped_release>(),
              "Erase memory matrix (C), but preserve address matrix (A).\n\n"
              "This resets all memory counters to zero while keeping the hard locations intact.")
         
@@ -4,10 +4,29 @@ Unit tests for Kanerva SDM.
 (c) 2026 Simon Wong
 """
 
+import os
+import platform
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
 import pytest
 import kanerva_sdm
 
 
+def cpu_has_avx2():
+    """Return True if /proc/cpuinfo reports AVX2 on an x86-64 Linux host.
+
+    False means AVX2 was not detected, not that the CPU lacks it.
+    """
+    if not sys.platform.startswith("linux") or platform.machine() not in ("x86_64", "AMD64"):
+        return False
+    with open("/proc/cpuinfo") as cpuinfo:
+        return " avx2" in cpuinfo.read()
+
+
 class TestKanervaSDM:
     """Test suite for KanervaSDM class."""
 
@@ -47,9 +66,142 @@ class TestKanervaSDM:
         assert sdm.memory_count == 1
         
         recalled = sdm.read(address)
-        assert len(recalled) == 100
-        assert all(isinstance(val, int) for val in recalled)
-        assert all(val in [0, 1] for val in recalled)
+        assert isinstance(recalled, np.ndarray)
+        assert recalled.dtype == np.uint8
+        assert recalled.shape == (100,)
+        assert recalled.max() <= 1
+
+    def test_write_and_read_ndarray(self):
+        """Test write and read with uint8 NumPy arrays."""
+        sdm = kanerva_sdm.KanervaSDM(256, 128, 1000, 110, random_seed=42)
+        
+        address = np.zeros(256, dtype=np.uint8)
+        memory = np.ones(128, dtype=np.uint8)
+        
+        sdm.write(address, memory)
+        assert sdm.memory_count == 1
+        
+        recalled = sdm.read(address)
+        assert recalled.dtype == np.uint8 and recalled.shape == (128,) and recalled.max() <= 1
+        assert np.array_equal(recalled, sdm.read(address.tolist()))
+        
+        with pytest.raises(ValueError):
+            sdm.write(np.full(256, 2, dtype=np.uint8), memory)
+        
+        with pytest.raises(ValueError):
+            sdm.read(np.zeros(128, dtype=np.uint8))
+
+    def test_full_threshold_activates_all_locations(self):
+        """Test that a threshold equal to the address dimension activates every location."""
+        sdm = kanerva_sdm.KanervaSDM(100, 100, 1000, 100, random_seed=42)
+        
+        memory = [1, 0] * 50
+        sdm.write([0] * 100, memory)
+        
+        assert sdm.read([1] * 100).tolist() == memory
+        assert sdm.read([0, 1] * 50).tolist() == memory
+
+    def test_large_activation_scan(self):
+        """Test that activation over 10000 locations matches a brute-force Hamming scan."""
+        rng = np.random.default_rng(0)
+        
+        # 320 and 1100 bits leave words past the last 256-bit stride; 10003 and
+        # 1001 locations leave a partial group of four.
+        cases = [(256, 115, 10000), (320, 145, 10003), (1100, 530, 1001), (100, 37, 10000)]
+        for address_dimension, threshold, num_locations in cases:
+            sdm = kanerva_sdm.KanervaSDM(address_dimension, 128, num_locations, threshold, random_seed=7)
+            hard_locations = sdm._address_matrix()
+            assert hard_locations.shape == (num_locations, address_dimension)
+            
+            # AVX2 is only used from four address words up. It can only be
+            # detected positively here, so other hosts may report either kernel.
+            if (address_dimension + 63) // 64 < 4:
+                assert sdm._scan_kernel == "scalar"
+            elif cpu_has_avx2():
+                assert sdm._scan_kernel == "avx2"
+            else:
+                assert sdm._scan_kernel in ("avx2", "scalar")
+            
+            for _ in range(3):
+                address = rng.integers(0, 2, address_dimension, dtype=np.uint8)
+                distances = (hard_locations != address).sum(axis=1)
+                expected = np.flatnonzero(distances <= threshold)
+                
+                activated = sdm.activated_locations(address)
+                assert 0 < len(activated) < num_locations
+                assert np.array_equal(activated, expected)
+                assert np.array_equal(sdm.activated_locations(address.tolist()), expected)
+
+    def test_sparse_activation_memory(self):
+        """Test that activated locations are returned as a compact index list."""
+        sdm = kanerva_sdm.KanervaSDM(256, 128, 10000, 110, random_seed=42)
+        address = np.zeros(256, dtype=np.uint8)
+        
+        activated = sdm.activated_locations(address)
+        assert activated.dtype == np.int32
+        assert 0 < len(activated) < 1000
+        assert activated.nbytes == 4 * len(activated)
+        assert np.all(np.diff(activated) > 0)
+        
+        # Smaller than a dense one-byte-per-location activation mask.
+        assert sys.getsizeof(activated) < sys.getsizeof(np.zeros(10000, dtype=bool))
+        
+        sdm.write(address, np.ones(128, dtype=np.uint8))
+        assert sdm.read(address).tolist() == [1] * 128
+
+    def test_specialized_dispatch_correctness(self):
+        """Test that specialized and generic scan kernels agree with a brute-force scan."""
+        rng = np.random.default_rng(2)
+        
+        # 100, 128, 256, 512 and 1024 bits use specialized kernels; 320 and 1100 use the generic one.
+        for address_dimension in [100, 128, 256, 320, 512, 1024, 1100]:
+            threshold = int(address_dimension / 2 - np.sqrt(address_dimension) / 2)
+            sdm = kanerva_sdm.KanervaSDM(address_dimension, 8, 2000, threshold, random_seed=5)
+            hard_locations = sdm._address_matrix()
+            
+            address = rng.integers(0, 2, address_dimension, dtype=np.uint8)
+            distances = (hard_locations != address).sum(axis=1)
+            expected = np.flatnonzero(distances <= threshold)
+            
+            assert len(expected) > 0
+            assert np.array_equal(sdm.activated_locations(address), expected)
+
+    def test_small_threshold_activation(self):
+        """Test activation with thresholds small enough to use the band index."""
+        rng = np.random.default_rng(1)
+        
+        for address_dimension, threshold in [(256, 3), (256, 7), (100, 3)]:
+            sdm = kanerva_sdm.KanervaSDM(address_dimension, 16, 20000, threshold, random_seed=3)
+            hard_locations = sdm._address_matrix()
+            
+            for target in rng.integers(0, 20000, 5):
+                # Start from a hard location and flip up to threshold bits.
+                address = hard_locations[target].copy()
+                flips = rng.choice(address_dimension, threshold, replace=False)
+                address[flips] ^= 1
+                distances = (hard_locations != address).sum(axis=1)
+                expected = np.flatnonzero(distances <= threshold)
+                
+                activated = sdm.activated_locations(address)
+                assert target in activated
+                assert np.array_equal(activated, expected)
+
+    def test_read_sublinear_scaling(self):
+        """Test that read time grows sublinearly with locations when the band index applies."""
+        def best_read_time(sdm):
+            address = np.zeros(256, dtype=np.uint8)
+            best = float("inf")
+            for _ in range(5):
+                start = time.perf_counter()
+                for _ in range(200):
+                    sdm.read(address)
+                best = min(best, time.perf_counter() - start)
+            return best
+        
+        small = kanerva_sdm.KanervaSDM(256, 32, 10000, 3, random_seed=42)
+        large = kanerva_sdm.KanervaSDM(256, 32, 100000, 3, random_seed=42)
+        
+        assert best_read_time(large) / best_read_time(small) < 5
 
     def test_write_invalid_address_size(self):
         """Test that incorrect address size raises ValueError."""
@@ -79,6 +231,31 @@ class TestKanervaSDM:
         with pytest.raises(ValueError):
             sdm.write([0] * 100, [3] * 100)
 
+    def test_non_binary_values_anywhere(self):
+        """Test that a single non-binary value is rejected at any position."""
+        sdm = kanerva_sdm.KanervaSDM(100, 100, 1000, 37)
+        
+        for position in [0, 31, 32, 63, 64, 99]:
+            for value in [2, 128, 255]:
+                address = np.zeros(100, dtype=np.uint8)
+                address[position] = value
+                with pytest.raises(ValueError):
+                    sdm.read(address)
+                with pytest.raises(ValueError):
+                    sdm.write(address, np.ones(100, dtype=np.uint8))
+            
+            address = [0] * 100
+            address[position] = -1
+            with pytest.raises(ValueError):
+                sdm.read(address)
+        
+        batch = np.zeros((4, 100), dtype=np.uint8)
+        batch[3, 99] = 2
+        with pytest.raises(ValueError):
+            sdm.write_many(np.zeros((4, 100), dtype=np.uint8), batch)
+        
+        assert sdm.memory_count == 0
+
     def test_read_invalid_address_size(self):
         """Test that incorrect address size raises ValueError during read."""
         sdm = kanerva_sdm.KanervaSDM(100, 100, 10000, 37)
@@ -119,6 +296,151 @@ class TestKanervaSDM:
             sdm.write(address, memory)
         
         assert sdm.memory_count == 5
+        
+        # The batched API stores the same rows in the same order.
+        batched = kanerva_sdm.KanervaSDM(100, 100, 10000, 37, random_seed=42)
+        addresses = [np.full(100, i % 2, dtype=np.uint8) for i in range(5)]
+        memories = [np.full(100, (i + 1) % 2, dtype=np.uint8) for i in range(5)]
+        batched.write_many(np.stack(addresses), np.stack(memories))
+        
+        assert batched.memory_count == 5
+        recalled = batched.read_many(np.stack(addresses))
+        assert recalled.shape == (5, 100)
+        for address, row in zip(addresses, recalled):
+            assert np.array_equal(row, sdm.read(address))
+
+    def test_write_many_matches_sequential_writes(self):
+        """Test that write_many and read_many agree with per-row write and read."""
+        rng = np.random.default_rng(3)
+        addresses = rng.integers(0, 2, (40, 256), dtype=np.uint8)
+        memories = rng.integers(0, 2, (40, 64), dtype=np.uint8)
+        
+        # Threshold 120 scans tiles; threshold 3 uses the band index.
+        for threshold in [120, 3]:
+            sequential = kanerva_sdm.KanervaSDM(256, 64, 3000, threshold, random_seed=9)
+            batched = kanerva_sdm.KanervaSDM(256, 64, 3000, threshold, random_seed=9)
+            
+            for address, memory in zip(addresses, memories):
+                sequential.write(address, memory)
+            batched.write_many(addresses, memories)
+            assert batched.memory_count == sequential.memory_count == 40
+            
+            expected = np.stack([sequential.read(address) for address in addresses])
+            assert np.array_equal(batched.read_many(addresses), expected)
+
+    def test_read_block_independence(self):
+        """Test that tiled reads match an untiled reference model, including partial tiles."""
+        rng = np.random.default_rng(4)
+        
+        for num_locations in [1, 63, 64, 511, 512, 513, 1300]:
+            sdm = kanerva_sdm.KanervaSDM(128, 32, num_locations, 60, random_seed=11)
+            hard_locations = sdm._address_matrix().astype(np.int32)
+            counters = np.zeros((num_locations, 32), dtype=np.int32)
+            
+            for _ in range(10):
+                address = rng.integers(0, 2, 128, dtype=np.uint8)
+                memory = rng.integers(0, 2, 32, dtype=np.uint8)
+                sdm.write(address, memory)
+                activated = (hard_locations != address).sum(axis=1) <= 60
+                counters[activated] += 2 * memory.astype(np.int32) - 1
+            
+            for _ in range(10):
+                address = rng.integers(0, 2, 128, dtype=np.uint8)
+                activated = (hard_locations != address).sum(axis=1) <= 60
+                if activated.any():
+                    expected = (counters[activated].sum(axis=0) >= 0).astype(int).tolist()
+                else:
+                    expected = [0] * 32
+                assert sdm.read(address).tolist() == expected
+
+    def test_read_parallel_consistency(self):
+        """Test that concurrent reads on one SDM match serial reads."""
+        rng = np.random.default_rng(5)
+        sdm = kanerva_sdm.KanervaSDM(256, 128, 10000, 120, random_seed=42)
+        sdm.write_many(rng.integers(0, 2, (50, 256), dtype=np.uint8),
+                       rng.integers(0, 2, (50, 128), dtype=np.uint8))
+        
+        addresses = rng.integers(0, 2, (64, 256), dtype=np.uint8)
+        expected = np.stack([sdm.read(address) for address in addresses])
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(sdm.read, addresses))
+            batches = list(executor.map(sdm.read_many, [addresses] * 8))
+        
+        assert np.array_equal(np.stack(results), expected)
+        for batch in batches:
+            assert np.array_equal(batch, expected)
+
+    def test_concurrent_writes_and_reads(self):
+        """Test that writes interleaved with reads across threads lose no updates."""
+        rng = np.random.default_rng(6)
+        addresses = rng.integers(0, 2, (96, 256), dtype=np.uint8)
+        memories = rng.integers(0, 2, (96, 64), dtype=np.uint8)
+        queries = rng.integers(0, 2, (32, 256), dtype=np.uint8)
+        
+        # Too few writes to saturate, so the final counters don't depend on write order.
+        serial = kanerva_sdm.KanervaSDM(256, 64, 5000, 120, random_seed=13)
+        for address, memory in zip(addresses, memories):
+            serial.write(address, memory)
+        
+        sdm = kanerva_sdm.KanervaSDM(256, 64, 5000, 120, random_seed=13)
+        
+        def work(i):
+            if i % 4 == 0:
+                sdm.write_many(addresses[i:i + 4], memories[i:i + 4])
+            elif i % 4 == 1:
+                sdm.read_many(queries)
+            elif i % 4 == 2:
+                sdm.read(queries[i % 32])
+            else:
+                sdm.memory_count
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(work, range(96)))
+        
+        assert sdm.memory_count == serial.memory_count == 96
+        assert np.array_equal(sdm.read_many(queries), serial.read_many(queries))
+
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+    def test_read_after_fork(self):
+        """Test that a forked child can still read after the parent has read."""
+        rng = np.random.default_rng(7)
+        sdm = kanerva_sdm.KanervaSDM(256, 64, 20000, 115, random_seed=42)
+        addresses = rng.integers(0, 2, (64, 256), dtype=np.uint8)
+        expected = sdm.read_many(addresses)
+        sdm.read(addresses[0])
+        
+        pid = os.fork()
+        if pid == 0:
+            # Child: a hang here is killed by the alarm; any failure exits non-zero.
+            ok = False
+            try:
+                signal.alarm(10)
+                ok = (np.array_equal(sdm.read(addresses[0]), expected[0])
+                      and np.array_equal(sdm.read_many(addresses), expected))
+            finally:
+                os._exit(0 if ok else 1)
+        
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+
+    def test_write_many_invalid_batches(self):
+        """Test that malformed batches raise ValueError."""
+        sdm = kanerva_sdm.KanervaSDM(100, 100, 1000, 37)
+        
+        with pytest.raises(ValueError):
+            sdm.write_many(np.zeros((3, 100), dtype=np.uint8), np.zeros((2, 100), dtype=np.uint8))
+        
+        with pytest.raises(ValueError):
+            sdm.write_many(np.zeros((2, 50), dtype=np.uint8), np.zeros((2, 100), dtype=np.uint8))
+        
+        with pytest.raises(ValueError):
+            sdm.write_many(np.zeros((2, 100), dtype=np.uint8), np.full((2, 100), 2, dtype=np.uint8))
+        
+        with pytest.raises(ValueError):
+            sdm.read_many(np.zeros(100, dtype=np.uint8))
+        
+        assert sdm.memory_count == 0
 
     def test_reproducibility_with_seed(self):
         """Test that same seed produces same behavior."""
@@ -134,7 +456,74 @@ class TestKanervaSDM:
         result1 = sdm1.read(address)
         result2 = sdm2.read(address)
         
-        assert result1 == result2
+        assert np.array_equal(result1, result2)
+
+    def test_saturation_behaviour(self):
+        """Test that memory counters saturate at +/-127."""
+        sdm = kanerva_sdm.KanervaSDM(256, 128, 1000, 115, random_seed=42)
+        address = np.zeros(256, dtype=np.uint8)
+        ones = np.ones(128, dtype=np.uint8)
+        zeros = np.zeros(128, dtype=np.uint8)
+        assert len(sdm.activated_locations(address)) > 0
+        
+        # Counters clamp at +127 rather than reaching +200.
+        for _ in range(200):
+            sdm.write(address, ones)
+        
+        # 127 opposite writes bring the counters back to zero, which reads as 1.
+        for _ in range(127):
+            sdm.write(address, zeros)
+        assert sdm.read(address).tolist() == [1] * 128
+        
+        sdm.write(address, zeros)
+        assert sdm.read(address).tolist() == [0] * 128
+        
+        # Counters also clamp at -127.
+        for _ in range(300):
+            sdm.write(address, zeros)
+        for _ in range(127):
+            sdm.write(address, ones)
+        assert sdm.read(address).tolist() == [1] * 128
+        assert sdm.memory_count == 755
+
+    def test_address_matrix_reproducibility(self):
+        """Test that the seed alone determines the hard locations."""
+        sdm1 = kanerva_sdm.KanervaSDM(100, 100, 10000, 37, random_seed=42)
+        sdm2 = kanerva_sdm.KanervaSDM(100, 100, 10000, 37, random_seed=42)
+        sdm3 = kanerva_sdm.KanervaSDM(100, 100, 10000, 37, random_seed=43)
+        
+        # Pins the generated stream, so changes to the generator are caught.
+        assert sdm1._address_matrix_digest() == 0xDE80EC26B71F06F2
+        assert sdm2._address_matrix_digest() == sdm1._address_matrix_digest()
+        assert sdm3._address_matrix_digest() != sdm1._address_matrix_digest()
+        
+        hard_locations = sdm1._address_matrix()
+        assert np.array_equal(hard_locations, sdm2._address_matrix())
+        assert abs(hard_locations.mean() - 0.5) < 0.01
+
+    def test_read_sign_edge_cases(self):
+        """Test majority-vote thresholding, including sums of exactly zero."""
+        # Every location is activated, so each sum is num_locations times the counter.
+        sdm = kanerva_sdm.KanervaSDM(64, 4, 100, 64, random_seed=42)
+        address = np.zeros(64, dtype=np.uint8)
+        
+        # Counters per dimension: +2, 0, 0, -2.
+        sdm.write(address, np.array([1, 1, 0, 0], dtype=np.uint8))
+        sdm.write(address, np.array([1, 0, 1, 0], dtype=np.uint8))
+        assert sdm.read(address).tolist() == [1, 1, 1, 0]
+        
+        # Counters per dimension: +1, -1, +1, -1.
+        sdm.write(address, np.array([0, 0, 1, 1], dtype=np.uint8))
+        assert sdm.read(address).tolist() == [1, 0, 1, 0]
+        
+        # Sums of zero from an erased memory read as all ones.
+        sdm.erase_memory()
+        assert sdm.read(address).tolist() == [1, 1, 1, 1]
+        
+        # With no activated locations the result is all zeros.
+        isolated = kanerva_sdm.KanervaSDM(256, 4, 100, 0, random_seed=42)
+        assert len(isolated.activated_locations(np.zeros(256, dtype=np.uint8))) == 0
+        assert isolated.read(np.zeros(256, dtype=np.uint8)).tolist() == [0, 0, 0, 0]
 
     def test_repr(self):
         """Test string representation."""